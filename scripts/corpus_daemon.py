@@ -0,0 +1,252 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Resident corpus query server, and the client used by the other scripts.
+
+Running this script loads the corpus once, keeps its indexes in memory and
+answers queries over a Unix socket until interrupted. The corpus is reloaded
+when the file changes. Scripts call query(), which asks the server when one
+is running and otherwise loads the corpus in-process.
+
+Each request is one line of JSON such as {"op": "sentences", "lang": "de"},
+answered by one line of JSON with either "result" or "error". Operations:
+
+    languages                bare language codes
+    apps                     app names
+    sentences [lang] [app]   sentences, in corpus order
+    words lang               distinct whitespace-separated words, sorted
+    sentence text            {"apps": [...], "langs": [...]} or null
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+CORPUS = Path(__file__).parent.parent / "corpus" / "aosp.json"
+# Seconds to wait for the server before loading the corpus in-process instead.
+TIMEOUT = 10
+
+
+class CorpusIndex:
+    """The corpus with its sentences indexed by bare language and by app."""
+
+    def __init__(self, path: Path = CORPUS):
+        self.stamp = file_stamp(path)
+        self.data: Dict[str, Dict[str, List[str]]] = json.loads(
+            path.read_text(encoding="utf-8")
+        )
+        self.lang_sentences: Dict[str, List[str]] = defaultdict(list)
+        self.app_sentences: Dict[str, List[str]] = defaultdict(list)
+        for sentence, info in self.data.items():
+            # NOTE: Android uses its own locale specifiers, so use the bare language.
+            for language in dict.fromkeys(l.split("-")[0] for l in info["langs"]):
+                self.lang_sentences[language].append(sentence)
+            for app in info["apps"]:
+                self.app_sentences[app].append(sentence)
+        self.lang_words: Dict[str, List[str]] = {}
+
+    def handle(self, request: Dict[str, Any]) -> Any:
+        op = request.get("op")
+        if op == "languages":
+            return sorted(self.lang_sentences)
+        if op == "apps":
+            return sorted(self.app_sentences)
+        if op == "sentences":
+            return self.sentences(request.get("lang"), request.get("app"))
+        if op == "words":
+            return self.words(request["lang"])
+        if op == "sentence":
+            return self.data.get(request["text"])
+        raise ValueError(f"Unknown op {op!r}")
+
+    def sentences(self, lang: Optional[str], app: Optional[str]) -> List[str]:
+        if lang is None and app is None:
+            return list(self.data)
+        if app is None:
+            return self.lang_sentences.get(lang, [])
+        if lang is None:
+            return self.app_sentences.get(app, [])
+        in_app = set(self.app_sentences.get(app, []))
+        return [s for s in self.lang_sentences.get(lang, []) if s in in_app]
+
+    def words(self, lang: str) -> List[str]:
+        if lang not in self.lang_words:
+            words = set()
+            for sentence in self.lang_sentences.get(lang, []):
+                words.update(sentence.split())
+            self.lang_words[lang] = sorted(words)
+        return self.lang_words[lang]
+
+
+def socket_path() -> Path:
+    """Return the socket to use, AOSP_CORPUS_SOCKET if it is set.
+
+    By default the socket lives in $XDG_RUNTIME_DIR, or else in a directory of
+    the temp directory that only the current user can access, so other local
+    users cannot put their own server in its place.
+    """
+    if "AOSP_CORPUS_SOCKET" in os.environ:
+        return Path(os.environ["AOSP_CORPUS_SOCKET"])
+    if runtime_dir := os.environ.get("XDG_RUNTIME_DIR"):
+        return Path(runtime_dir) / "aosp-test-texts.sock"
+    folder = Path(tempfile.gettempdir()) / f"aosp-test-texts-{os.getuid()}"
+    folder.mkdir(mode=0o700, exist_ok=True)
+    info = folder.lstat()
+    if (
+        not stat.S_ISDIR(info.st_mode)
+        or info.st_uid != os.getuid()
+        or info.st_mode & 0o077
+    ):
+        raise PermissionError(f"{folder} is not a private directory of this user")
+    return folder / "corpus.sock"
+
+
+def file_stamp(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, corpus: Path):
+        self.corpus = corpus
+        self.index = CorpusIndex(corpus)
+        # Stamp of a corpus file that failed to load, not to be retried.
+        self.failed_stamp: Optional[Tuple[int, int]] = None
+        self.reload_lock = threading.Lock()
+        super().__init__(str(socket_path), Handler)
+
+    def current_index(self) -> CorpusIndex:
+        """Return the index, reloading it first if the corpus file changed.
+
+        If the changed file cannot be loaded, keep serving the previous index.
+        """
+        with self.reload_lock:
+            try:
+                stamp = file_stamp(self.corpus)
+            except OSError as e:
+                print(f"Cannot stat {self.corpus}, keeping the old index: {e}")
+                return self.index
+            if stamp in (self.index.stamp, self.failed_stamp):
+                return self.index
+            try:
+                index = CorpusIndex(self.corpus)
+            except Exception as e:
+                self.failed_stamp = stamp
+                print(f"Failed to reload {self.corpus}, keeping the old index: {e}")
+            else:
+                self.index = index
+                print(f"Reloaded {self.corpus}")
+        return self.index
+
+
+class Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                result = self.server.current_index().handle(json.loads(line))
+                response = {"result": result}
+            except Exception as e:
+                response = {"error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8"))
+            self.wfile.write(b"\n")
+
+
+@lru_cache(maxsize=None)
+def local_index() -> CorpusIndex:
+    return CorpusIndex(CORPUS)
+
+
+def query(op: str, **params: Any) -> Any:
+    """Answer a query, from the server if one is running and responsive."""
+    request = {"op": op, **params}
+    if hasattr(socket, "AF_UNIX"):
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(TIMEOUT)
+                sock.connect(str(socket_path()))
+                sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+                with sock.makefile("rb") as fp:
+                    response = json.loads(fp.readline())
+        # Includes timeouts, an unusable socket directory, and an empty or cut
+        # off reply from a dying server.
+        except (OSError, ValueError):
+            pass
+        else:
+            if "error" in response:
+                raise RuntimeError(response["error"])
+            return response["result"]
+    return local_index().handle(request)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        help="Socket to listen on, also settable with AOSP_CORPUS_SOCKET. By "
+        "default in $XDG_RUNTIME_DIR or a private directory in the temp directory.",
+    )
+    parser.add_argument("--corpus", type=Path, default=CORPUS, help="Corpus to serve.")
+    args = parser.parse_args()
+    if args.socket is None:
+        try:
+            args.socket = socket_path()
+        except OSError as e:
+            parser.error(str(e))
+
+    try:
+        mode = args.socket.lstat().st_mode
+    except FileNotFoundError:
+        pass
+    else:
+        if not stat.S_ISSOCK(mode):
+            parser.error(f"{args.socket} exists and is not a socket")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(str(args.socket))
+            except ConnectionRefusedError:
+                # Left behind by a server that did not shut down cleanly.
+                args.socket.unlink()
+            else:
+                parser.error(f"a server is already listening on {args.socket}")
+
+    # Exit through the finally clause below, which removes the socket.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit())
+    with Server(args.socket, args.corpus) as server:
+        print(f"Serving {args.corpus} on {args.socket}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            args.socket.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,32 +19,25 @@ sublocale-specifiers.
 """
 
 import argparse
-import collections
-import json
 import tempfile
 from pathlib import Path
 from typing import Dict, List
 
+from corpus_daemon import query
+
 parser = argparse.ArgumentParser()
 parser.add_argument(
     "languages", nargs="+", help="ISO 639-1 language codes to extract sentences for."
 )
 parsed_args = parser.parse_args()
 
-CORPUS = Path(__file__).parent.parent / "corpus" / "aosp.json"
-
-with open(CORPUS) as f:
-    data = json.load(f)
-
 # NOTE: Android seems to use different local specifiers, so just use the bare language.
 desired_languages = set(l.split("-")[0] for l in parsed_args.languages)
-findings: Dict[str, List[str]] = collections.defaultdict(list)
+findings: Dict[str, List[str]] = {}
 
-for sentence, info in data.items():
-    languages = set(l.split("-")[0] for l in info["langs"])
-    for l in languages:
-        if l in desired_languages:
-            findings[l].append(sentence)
+for l in desired_languages:
+    if sentences := query("sentences", lang=l):
+        findings[l] = sentences
 
 TEMP_DIR = Path(tempfile.gettempdir())
 
@@ -12,43 +12,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
-from collections import defaultdict
 from pathlib import Path
-from typing import cast
 
-CORPUS = Path(__file__).parent.parent / "corpus" / "aosp.json"
+from corpus_daemon import query
 
 
 def main() -> None:
-    data = json.loads(CORPUS.read_text(encoding="utf-8"))
-
-    # Lang -> words
-    lang_words: dict[str, set[str]] = defaultdict(set)
-
-    for sentence, info in data.items():
-        sentence = cast(str, sentence)
-
-        words = set()
-        for word in sentence.split():
-            word = word.strip()
-            if word != "":
-                words.add(word)
-
-        languages = set()
-        for language_string in info["langs"]:
-            language = language_string.split("-")[0]
-            if len(language) == 2:
-                languages.add(language)
-
-        for language in languages:
-            lang_words[language].update(words)
-
     out_dir = Path("output")
     out_dir.mkdir(exist_ok=True)
-    for language, words in lang_words.items():
+    for language in query("languages"):
+        if len(language) != 2:
+            continue
+        words: list[str] = query("words", lang=language)
         out_file = out_dir / f"{language}.txt"
-        out_file.write_text("\n".join(sorted(words)) + "\n", encoding="utf-8")
+        out_file.write_text("\n".join(words) + "\n", encoding="utf-8")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,151 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Write proof pages of lines filled with whole sentences.
+
+Every line is made of corpus sentences separated by spaces and is at most the
+target width and at most --max-slack narrower than it. Lines are packed best
+fit decreasing: each line starts with the widest sentence left and is topped
+up with the widest sentence that still fits. Sentences are bucketed by width,
+so packing takes O(sentences * width). Sentences that would end up on a line
+with too much slack are left out.
+
+Pages are separated by form feeds.
+"""
+
+import argparse
+import tempfile
+import unicodedata
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List
+
+from corpus_daemon import query
+
+SEPARATOR = " "
+
+
+def char_advance(char: str) -> int:
+    """Estimate the advance of a character in units of a Latin letter."""
+    if unicodedata.category(char) in ("Mn", "Me", "Cf"):
+        return 0
+    if unicodedata.east_asian_width(char) in ("W", "F"):
+        return 2
+    return 1
+
+
+def advance(text: str) -> int:
+    return sum(map(char_advance, text))
+
+
+MEASURES = {"chars": len, "advance": advance}
+
+
+def pack_lines(
+    sentences: Iterable[str],
+    width: int,
+    max_slack: int,
+    measure: Callable[[str], int] = len,
+) -> Iterator[str]:
+    """Yield lines of sentences between `width - max_slack` and `width` wide."""
+    separator = measure(SEPARATOR)
+    # Sentences by width, reversed so that pop() takes them in input order.
+    buckets: List[List[str]] = [[] for _ in range(width + 1)]
+    for sentence in sentences:
+        sentence_width = measure(sentence)
+        if 0 < sentence_width <= width:
+            buckets[sentence_width].append(sentence)
+    for bucket in buckets:
+        bucket.reverse()
+    widest = width
+
+    def take(limit: int) -> str:
+        """Remove and return the widest sentence at most `limit` wide, or ""."""
+        nonlocal widest
+        while widest > 0 and not buckets[widest]:
+            widest -= 1
+        for sentence_width in range(min(limit, widest), 0, -1):
+            if buckets[sentence_width]:
+                return buckets[sentence_width].pop()
+        return ""
+
+    while sentence := take(width):
+        line = [sentence]
+        remaining = width - measure(sentence)
+        while remaining > separator and (sentence := take(remaining - separator)):
+            line.append(sentence)
+            remaining -= separator + measure(sentence)
+        if remaining <= max_slack:
+            yield SEPARATOR.join(line)
+
+
+def paginate(lines: Iterable[str], lines_per_page: int) -> Iterator[List[str]]:
+    page = []
+    for line in lines:
+        page.append(line)
+        if len(page) == lines_per_page:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "languages", nargs="+", help="ISO 639-1 language codes to write proofs for."
+    )
+    parser.add_argument(
+        "--width", type=int, default=60, help="Target line width (default: 60)."
+    )
+    parser.add_argument(
+        "--max-slack",
+        type=int,
+        default=2,
+        help="How much narrower than the target a line may be (default: 2).",
+    )
+    parser.add_argument(
+        "--measure",
+        choices=MEASURES,
+        default="chars",
+        help="Measure width in codepoints, or in estimated advances where marks "
+        "are zero and wide East Asian characters two units wide "
+        "(default: chars).",
+    )
+    parser.add_argument(
+        "--lines-per-page", type=int, default=40, help="Lines per page (default: 40)."
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=Path(tempfile.gettempdir()),
+        help="Where to write proof-<language>.txt (default: the temp directory).",
+    )
+    args = parser.parse_args()
+
+    # NOTE: Android seems to use different local specifiers, so just use the bare language.
+    for language in dict.fromkeys(l.split("-")[0] for l in args.languages):
+        sentences = query("sentences", lang=language)
+        measure = MEASURES[args.measure]
+        lines = pack_lines(sentences, args.width, args.max_slack, measure)
+        target_path = args.output_dir / f"proof-{language}.txt"
+        with open(target_path, "w", encoding="utf-8") as f:
+            for number, page in enumerate(paginate(lines, args.lines_per_page)):
+                if number:
+                    f.write("\f\n")
+                f.write("\n".join(page) + "\n")
+        print(f"Wrote {str(target_path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Columnar per-sentence features of the corpus, and filtering on them.
+
+The table is written by `extract_strings.py --features`. Every feature is one
+typed array aligned by sentence ID (the 0-based position of the sentence in
+`aosp.json`), stored little-endian in `<feature>.bin`. Each feature also has
+`<feature>.order.bin`, the sentence IDs sorted by that feature, so a range
+predicate is two binary searches and combining predicates is a set
+intersection.
+
+Examples:
+
+    python src/corpus_features.py --length 20:40 --script CYRILLIC --no-digits
+    python src/corpus_features.py --apps 10: --punctuation --count
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+FEATURES = Path(__file__).parent / "../corpus/features"
+
+# Feature name -> array typecode.
+COLUMNS = {
+    # Number of codepoints.
+    "length": "I",
+    # Number of distinct codepoints.
+    "codepoints": "I",
+    # Index into the "scripts" list of index.json.
+    "script": "H",
+    # 1 if there is a decimal digit, else 0.
+    "digits": "B",
+    # 1 if there is a punctuation character, else 0.
+    "punctuation": "B",
+    # Number of apps using the sentence.
+    "apps": "H",
+}
+
+# Script of sentences without any letters.
+COMMON = "COMMON"
+
+# Prefixes of Unicode character names that are not the script name.
+NAME_PREFIXES = ("FULLWIDTH", "HALFWIDTH", "SMALL")
+
+Range = Tuple[Optional[int], Optional[int]]
+
+
+@lru_cache(maxsize=None)
+def char_script(char: str) -> Optional[str]:
+    """Approximate the script of a letter from its Unicode character name.
+
+    The standard library has no Unicode script property, but letter names
+    start with their script ("LATIN SMALL LETTER A", "CJK UNIFIED
+    IDEOGRAPH-4E00"). Returns None for anything that is not a letter.
+    """
+    if not unicodedata.category(char).startswith("L"):
+        return None
+    words = unicodedata.name(char, "UNKNOWN").split()
+    while len(words) > 1 and words[0] in NAME_PREFIXES:
+        words.pop(0)
+    return words[0]
+
+
+def dominant_script(sentence: str) -> str:
+    """Return the script of most letters in the sentence."""
+    scripts = Counter(filter(None, map(char_script, sentence)))
+    if not scripts:
+        return COMMON
+    return scripts.most_common(1)[0][0]
+
+
+class FeatureWriter:
+    """Compute the features of sorted corpus entries and write them to `path`.
+
+    The table is built in a directory next to `path` and only moved into place
+    by close(), so an interrupted export never mixes old and new files.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.partial = self.path.with_name(self.path.name + ".partial")
+        shutil.rmtree(self.partial, ignore_errors=True)
+        self.partial.mkdir(parents=True)
+        self.columns = {name: array(code) for name, code in COLUMNS.items()}
+        self.scripts: Dict[str, int] = {}
+        self.text = open(self.partial / "text.bin", "wb")
+        self.text_offsets = array("Q", [0])
+
+    def add(self, entry: Tuple[str, List[str], List[str]]) -> None:
+        string, apps, _langs = entry
+        script = dominant_script(string)
+        if script not in self.scripts:
+            self.scripts[script] = len(self.scripts)
+        categories = {unicodedata.category(char) for char in set(string)}
+        self.columns["length"].append(len(string))
+        self.columns["codepoints"].append(len(set(string)))
+        self.columns["script"].append(self.scripts[script])
+        self.columns["digits"].append("Nd" in categories)
+        self.columns["punctuation"].append(any(c[0] == "P" for c in categories))
+        self.columns["apps"].append(len(apps))
+        encoded = string.encode("utf-8")
+        self.text.write(encoded)
+        self.text_offsets.append(self.text_offsets[-1] + len(encoded))
+
+    def close(self) -> None:
+        self.text.close()
+        write_array(self.text_offsets, self.partial / "text.offsets.bin")
+        for name, column in self.columns.items():
+            write_array(column, self.partial / f"{name}.bin")
+            order = array("I", sorted(range(len(column)), key=column.__getitem__))
+            write_array(order, self.partial / f"{name}.order.bin")
+        index = {
+            "count": len(self.text_offsets) - 1,
+            "columns": COLUMNS,
+            "scripts": list(self.scripts),
+        }
+        with open(self.partial / "index.json", "w", encoding="utf-8") as fp:
+            json.dump(index, fp, indent=2)
+        # Directories cannot be replaced atomically, keep the window small.
+        if self.path.exists():
+            old = self.path.with_name(self.path.name + ".old")
+            shutil.rmtree(old, ignore_errors=True)
+            self.path.rename(old)
+            self.partial.rename(self.path)
+            shutil.rmtree(old)
+        else:
+            self.partial.rename(self.path)
+
+    def discard(self) -> None:
+        """Abandon the table, leaving any previous one in place."""
+        self.text.close()
+        shutil.rmtree(self.partial, ignore_errors=True)
+
+
+class FeatureTable:
+    """A feature table written by FeatureWriter."""
+
+    def __init__(self, path: Path = FEATURES):
+        path = Path(path)
+        if not (path / "index.json").exists():
+            raise FileNotFoundError(
+                f"{path} has no features, run extract_strings.py --features"
+            )
+        index = json.loads((path / "index.json").read_text(encoding="utf-8"))
+        self.count: int = index["count"]
+        self.scripts: List[str] = index["scripts"]
+        self.columns = {
+            name: read_array(code, path / f"{name}.bin")
+            for name, code in index["columns"].items()
+        }
+        self.orders = {
+            name: read_array("I", path / f"{name}.order.bin")
+            for name in index["columns"]
+        }
+        self.text = (path / "text.bin").read_bytes()
+        self.text_offsets = read_array("Q", path / "text.offsets.bin")
+
+    def sentence(self, sentence_id: int) -> str:
+        start, end = self.text_offsets[sentence_id : sentence_id + 2]
+        return self.text[start:end].decode("utf-8")
+
+    def select(self, **predicates: Union[Range, bool, str]) -> List[int]:
+        """Return the sorted IDs of the sentences matching all predicates.
+
+        Numeric features take an inclusive (min, max) range where either bound
+        may be None, "digits" and "punctuation" take a bool and "script" takes
+        a script name such as "LATIN", in any case. Raises ValueError for a
+        script that is not the dominant script of any sentence.
+        """
+        candidates = []
+        for name, predicate in predicates.items():
+            if name not in self.columns:
+                raise ValueError(f"Unknown feature {name!r}")
+            if name == "script":
+                script = predicate.upper()
+                if script not in self.scripts:
+                    raise ValueError(
+                        f"Unknown script {predicate!r}, "
+                        f"known: {', '.join(sorted(self.scripts))}"
+                    )
+                low = high = self.scripts.index(script)
+            elif isinstance(predicate, bool):
+                low = high = int(predicate)
+            else:
+                low, high = predicate
+            order = self.orders[name]
+            key = self.columns[name].__getitem__
+            start = 0 if low is None else bisect_left(order, low, key=key)
+            end = len(order) if high is None else bisect_right(order, high, key=key)
+            candidates.append(order[start:end])
+        if not candidates:
+            return list(range(self.count))
+
+        # Start from the most selective predicate.
+        candidates.sort(key=len)
+        selected = set(candidates[0])
+        for ids in candidates[1:]:
+            if not selected:
+                break
+            selected.intersection_update(ids)
+        return sorted(selected)
+
+
+def write_array(values: array, path: Path) -> None:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    with open(path, "wb") as fp:
+        values.tofile(fp)
+
+
+def read_array(typecode: str, path: Path) -> array:
+    values = array(typecode)
+    values.frombytes(path.read_bytes())
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def parse_range(text: str) -> Range:
+    low, separator, high = text.partition(":")
+    if not separator:
+        high = low
+    return (int(low) if low else None, int(high) if high else None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--features", type=Path, default=FEATURES, help="Feature table to use."
+    )
+    for name in ("length", "codepoints", "apps"):
+        parser.add_argument(
+            f"--{name}",
+            type=parse_range,
+            metavar="MIN:MAX",
+            help=f"Inclusive range of {name}, either bound may be omitted.",
+        )
+    parser.add_argument("--script", help="Dominant script, e.g. LATIN or ARABIC.")
+    for name in ("digits", "punctuation"):
+        parser.add_argument(
+            f"--{name}",
+            action=argparse.BooleanOptionalAction,
+            help=f"Only sentences with (or without) {name}.",
+        )
+    parser.add_argument(
+        "--count", action="store_true", help="Only print the number of matches."
+    )
+    args = parser.parse_args()
+
+    table = FeatureTable(args.features)
+    predicates = {
+        name: getattr(args, name)
+        for name in COLUMNS
+        if getattr(args, name) is not None
+    }
+    try:
+        ids = table.select(**predicates)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.count:
+        print(len(ids))
+    else:
+        for sentence_id in ids:
+            print(table.sentence(sentence_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Chunked, compressed NDJSON variant of the corpus, with random access.
+
+The file is written by `extract_strings.py --ndjson`. Every line is an object
+with "sentence", "apps" and "langs", in the same order as `aosp.json`. Lines
+are grouped into chunks that are compressed independently (gzip for `.gz`,
+lzma for `.xz`) and concatenated, so the whole file still decompresses with
+`zcat` or `xzcat`. `<file>.index.json` records the file size and lists the
+byte offset, length, line count and first sentence of every chunk, so a chunk
+or a range of sentences can be read without decompressing anything else.
+
+Examples:
+
+    python src/corpus_ndjson.py --info
+    python src/corpus_ndjson.py --chunk 3
+    python src/corpus_ndjson.py --start A --stop B
+"""
+
+import argparse
+import gzip
+import json
+import lzma
+import sys
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+NDJSON = Path(__file__).parent / "../corpus/aosp.ndjson.gz"
+
+# Number of lines per chunk.
+CHUNK_SIZE = 10000
+
+COMPRESSIONS = {
+    ".gz": (lambda data: gzip.compress(data, mtime=0), gzip.decompress),
+    ".xz": (lzma.compress, lzma.decompress),
+}
+
+Entry = Tuple[str, List[str], List[str]]
+
+
+def index_path(path: Path) -> Path:
+    return path.with_name(path.name + ".index.json")
+
+
+def codec(path: Path):
+    if path.suffix not in COMPRESSIONS:
+        raise ValueError(
+            f"{path}: unknown compression, use one of {', '.join(COMPRESSIONS)}"
+        )
+    return COMPRESSIONS[path.suffix]
+
+
+class NdjsonWriter:
+    """Write sorted corpus entries as chunked, compressed NDJSON to `path`.
+
+    The file and its index are written next to `path` and only moved into
+    place by close().
+    """
+
+    def __init__(self, path: Path, chunk_size: int = CHUNK_SIZE):
+        self.path = Path(path)
+        self.compress, _ = codec(self.path)
+        self.chunk_size = chunk_size
+        self.partial = self.path.with_name(self.path.name + ".partial")
+        self.partial_index = index_path(self.partial)
+        self.fp = open(self.partial, "wb")
+        self.lines: List[str] = []
+        self.first = ""
+        self.chunks: List[Dict[str, Any]] = []
+
+    def add(self, entry: Entry) -> None:
+        string, apps, langs = entry
+        if not self.lines:
+            self.first = string
+        self.lines.append(
+            json.dumps(
+                {"sentence": string, "apps": apps, "langs": langs},
+                ensure_ascii=False,
+            )
+        )
+        if len(self.lines) >= self.chunk_size:
+            self._flush()
+
+    def close(self) -> None:
+        self._flush()
+        size = self.fp.tell()
+        self.fp.close()
+        index = {"compression": self.path.suffix, "size": size, "chunks": self.chunks}
+        with open(self.partial_index, "w", encoding="utf-8") as fp:
+            json.dump(index, fp, ensure_ascii=False, indent=2)
+        # Two files cannot be replaced at once. Readers check "size" to detect
+        # a data file and index from different runs.
+        self.partial.replace(self.path)
+        self.partial_index.replace(index_path(self.path))
+
+    def discard(self) -> None:
+        self.fp.close()
+        self.partial.unlink(missing_ok=True)
+        self.partial_index.unlink(missing_ok=True)
+
+    def _flush(self) -> None:
+        if not self.lines:
+            return
+        data = self.compress(("\n".join(self.lines) + "\n").encode("utf-8"))
+        self.chunks.append(
+            {
+                "offset": self.fp.tell(),
+                "length": len(data),
+                "count": len(self.lines),
+                "first": self.first,
+            }
+        )
+        self.fp.write(data)
+        self.lines = []
+
+
+class NdjsonReader:
+    """Random access to the chunks of a file written by NdjsonWriter."""
+
+    def __init__(self, path: Path = NDJSON):
+        self.path = Path(path)
+        _, self.decompress = codec(self.path)
+        with open(index_path(self.path), encoding="utf-8") as fp:
+            index = json.load(fp)
+        if index["size"] != self.path.stat().st_size:
+            raise ValueError(f"{self.path} does not match its index, rewrite both")
+        self.chunks: List[Dict[str, Any]] = index["chunks"]
+        self.firsts = [chunk["first"] for chunk in self.chunks]
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def chunk_lines(self, number: int) -> List[str]:
+        """Return the raw NDJSON lines of one chunk."""
+        chunk = self.chunks[number]
+        with open(self.path, "rb") as fp:
+            fp.seek(chunk["offset"])
+            data = fp.read(chunk["length"])
+        # Not splitlines(), sentences may contain other line separators.
+        return self.decompress(data).decode("utf-8").split("\n")[:-1]
+
+    def chunk(self, number: int) -> Iterator[Entry]:
+        for line in self.chunk_lines(number):
+            item = json.loads(line)
+            yield item["sentence"], item["apps"], item["langs"]
+
+    def range(
+        self, start: Optional[str] = None, stop: Optional[str] = None
+    ) -> Iterator[Entry]:
+        """Yield the entries with start <= sentence < stop, in order.
+
+        Only the chunks that can contain such sentences are decompressed.
+        """
+        first = 0 if start is None else max(bisect_right(self.firsts, start) - 1, 0)
+        for number in range(first, len(self.chunks)):
+            if stop is not None and self.firsts[number] >= stop:
+                return
+            for entry in self.chunk(number):
+                if stop is not None and entry[0] >= stop:
+                    return
+                if start is None or entry[0] >= start:
+                    yield entry
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--ndjson", type=Path, default=NDJSON, help="File to read.")
+    parser.add_argument(
+        "--info", action="store_true", help="Print the chunk index and exit."
+    )
+    parser.add_argument("--chunk", type=int, help="Print the lines of this chunk.")
+    parser.add_argument("--start", help="Print lines from this sentence on.")
+    parser.add_argument("--stop", help="Print lines before this sentence.")
+    args = parser.parse_args()
+
+    reader = NdjsonReader(args.ndjson)
+    if args.info:
+        for number, chunk in enumerate(reader.chunks):
+            print(number, chunk["offset"], chunk["length"], chunk["count"])
+    elif args.chunk is not None:
+        for line in reader.chunk_lines(args.chunk):
+            print(line)
+    else:
+        for string, apps, langs in reader.range(args.start, args.stop):
+            json.dump(
+                {"sentence": string, "apps": apps, "langs": langs},
+                sys.stdout,
+                ensure_ascii=False,
+            )
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""SQLite export of the corpus, and a command line tool to query it.
+
+The database is written by `extract_strings.py --sqlite`. Sentence IDs are the
+0-based positions of the sentences in `aosp.json`. Substring searches go
+through a case-sensitive trigram full-text index (SQLite 3.34 or later), so
+they do not have to scan every sentence.
+
+Examples:
+
+    python src/corpus_sqlite.py --contains ffi
+    python src/corpus_sqlite.py --lang ar --contains لا
+    python src/corpus_sqlite.py --regex "[A-Za-z]" --regex "[А-я]" --count
+"""
+
+import argparse
+import re
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+DATABASE = Path(__file__).parent / "../corpus/aosp.sqlite"
+
+SCHEMA = """
+CREATE TABLE sentences (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL
+);
+CREATE TABLE apps (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE langs (
+    id INTEGER PRIMARY KEY,
+    code TEXT NOT NULL UNIQUE,
+    base TEXT NOT NULL
+);
+CREATE TABLE sentence_apps (
+    sentence_id INTEGER NOT NULL REFERENCES sentences (id),
+    app_id INTEGER NOT NULL REFERENCES apps (id),
+    PRIMARY KEY (sentence_id, app_id)
+) WITHOUT ROWID;
+CREATE TABLE sentence_langs (
+    sentence_id INTEGER NOT NULL REFERENCES sentences (id),
+    lang_id INTEGER NOT NULL REFERENCES langs (id),
+    PRIMARY KEY (sentence_id, lang_id)
+) WITHOUT ROWID;
+-- Created up front so that an SQLite without the trigram tokenizer fails
+-- before extraction. Filled in by the rebuild in INDEXES.
+CREATE VIRTUAL TABLE sentences_fts USING fts5(
+    text,
+    content = 'sentences',
+    content_rowid = 'id',
+    tokenize = 'trigram case_sensitive 1'
+);
+"""
+
+# Built after the bulk insert, which is faster than maintaining them per row.
+INDEXES = """
+CREATE INDEX langs_base ON langs (base);
+CREATE INDEX sentence_apps_app ON sentence_apps (app_id, sentence_id);
+CREATE INDEX sentence_langs_lang ON sentence_langs (lang_id, sentence_id);
+INSERT INTO sentences_fts (sentences_fts) VALUES ('rebuild');
+"""
+
+# Shorter substrings than this cannot use the trigram index.
+TRIGRAM = 3
+
+
+class DatabaseWriter:
+    """Write sorted corpus entries to a new SQLite database at `path`.
+
+    The database is built next to `path` and only moved into place by close(),
+    so an interrupted export never leaves a partial database behind.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.partial = self.path.with_name(self.path.name + ".partial")
+        self.partial.unlink(missing_ok=True)
+        self.conn = sqlite3.connect(self.partial)
+        try:
+            self.conn.executescript(
+                "PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;" + SCHEMA
+            )
+        except sqlite3.Error:
+            self.discard()
+            raise
+        self.apps: Dict[str, int] = {}
+        self.langs: Dict[str, int] = {}
+        self.next_id = 0
+
+    def add(self, entry: Tuple[str, List[str], List[str]]) -> None:
+        string, apps, langs = entry
+        sentence_id = self.next_id
+        self.next_id += 1
+        self.conn.execute(
+            "INSERT INTO sentences (id, text) VALUES (?, ?)", (sentence_id, string)
+        )
+        self.conn.executemany(
+            "INSERT INTO sentence_apps (sentence_id, app_id) VALUES (?, ?)",
+            [(sentence_id, self._app_id(app)) for app in apps],
+        )
+        self.conn.executemany(
+            "INSERT INTO sentence_langs (sentence_id, lang_id) VALUES (?, ?)",
+            [(sentence_id, self._lang_id(lang)) for lang in langs],
+        )
+
+    def close(self) -> None:
+        self.conn.executescript(INDEXES)
+        self.conn.commit()
+        self.conn.execute("VACUUM")
+        self.conn.close()
+        self.partial.replace(self.path)
+
+    def discard(self) -> None:
+        self.conn.close()
+        self.partial.unlink(missing_ok=True)
+
+    def _app_id(self, app: str) -> int:
+        if app not in self.apps:
+            self.apps[app] = len(self.apps)
+            self.conn.execute(
+                "INSERT INTO apps (id, name) VALUES (?, ?)", (self.apps[app], app)
+            )
+        return self.apps[app]
+
+    def _lang_id(self, lang: str) -> int:
+        if lang not in self.langs:
+            self.langs[lang] = len(self.langs)
+            self.conn.execute(
+                "INSERT INTO langs (id, code, base) VALUES (?, ?, ?)",
+                (self.langs[lang], lang, base_language(lang)),
+            )
+        return self.langs[lang]
+
+
+def base_language(lang: str) -> str:
+    # NOTE: Android uses its own locale specifiers, so match on the bare language.
+    return lang.split("-")[0]
+
+
+def connect(path: Path = DATABASE) -> sqlite3.Connection:
+    """Open an exported database read-only, with a REGEXP function installed."""
+    if not Path(path).exists():
+        raise FileNotFoundError(
+            f"{path} does not exist, run extract_strings.py --sqlite to create it"
+        )
+    conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+    conn.create_function(
+        "regexp",
+        2,
+        lambda pattern, text: re.search(pattern, text) is not None,
+        deterministic=True,
+    )
+    return conn
+
+
+def query(
+    conn: sqlite3.Connection,
+    contains: Sequence[str] = (),
+    regexes: Sequence[str] = (),
+    langs: Sequence[str] = (),
+    apps: Sequence[str] = (),
+    limit: Optional[int] = None,
+) -> Iterator[str]:
+    """Yield the sentences matching all given criteria, in corpus order.
+
+    A sentence matches if it contains every substring in `contains`, matches
+    every Python regular expression in `regexes`, is used by any of `langs`
+    (bare language codes, any locale specifier is ignored) and by any of `apps`.
+    """
+    conditions = []
+    params: List[object] = []
+    trigram_terms = [term for term in contains if len(term) >= TRIGRAM]
+    if trigram_terms:
+        conditions.append(
+            "s.id IN (SELECT rowid FROM sentences_fts WHERE sentences_fts MATCH ?)"
+        )
+        params.append(
+            " AND ".join('"' + term.replace('"', '""') + '"' for term in trigram_terms)
+        )
+    for term in contains:
+        if len(term) < TRIGRAM:
+            conditions.append("instr(s.text, ?) > 0")
+            params.append(term)
+    for pattern in regexes:
+        conditions.append("s.text REGEXP ?")
+        params.append(pattern)
+    if langs:
+        conditions.append(
+            "s.id IN (SELECT sl.sentence_id FROM sentence_langs sl"
+            " JOIN langs l ON l.id = sl.lang_id"
+            f" WHERE l.base IN ({', '.join('?' * len(langs))}))"
+        )
+        params.extend(base_language(lang) for lang in langs)
+    if apps:
+        conditions.append(
+            "s.id IN (SELECT sa.sentence_id FROM sentence_apps sa"
+            " JOIN apps a ON a.id = sa.app_id"
+            f" WHERE a.name IN ({', '.join('?' * len(apps))}))"
+        )
+        params.extend(apps)
+
+    sql = "SELECT s.text FROM sentences s"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY s.id"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    for (text,) in conn.execute(sql, params):
+        yield text
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--db", type=Path, default=DATABASE, help="Database to query.")
+    parser.add_argument(
+        "--contains",
+        action="append",
+        default=[],
+        metavar="TEXT",
+        help="Substring the sentence must contain. Can be repeated.",
+    )
+    parser.add_argument(
+        "--regex",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="Python regular expression the sentence must match. Can be repeated.",
+    )
+    parser.add_argument(
+        "--lang",
+        action="append",
+        default=[],
+        help="Only sentences in any of these languages. Can be repeated.",
+    )
+    parser.add_argument(
+        "--app",
+        action="append",
+        default=[],
+        help="Only sentences used by any of these apps. Can be repeated.",
+    )
+    parser.add_argument("--limit", type=int, help="Print at most this many.")
+    parser.add_argument(
+        "--count", action="store_true", help="Only print the number of matches."
+    )
+    args = parser.parse_args()
+
+    with closing(connect(args.db)) as conn:
+        sentences = query(
+            conn, args.contains, args.regex, args.lang, args.app, args.limit
+        )
+        if args.count:
+            print(sum(1 for _ in sentences))
+        else:
+            for sentence in sentences:
+                print(sentence)
+
+
+if __name__ == "__main__":
+    main()
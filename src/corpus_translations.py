@@ -0,0 +1,182 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Translations of string resources across locales.
+
+The index is an SQLite database written by `extract_strings.py
+--translations`. It maps (app, resource name, locale) to the sentences of
+that string, in line order, and stores the sentence text itself, so lookups
+never touch `aosp.json`. Sentence IDs are the 0-based positions of the
+sentences in the `aosp.json` written in the same run. String array items are
+named "<array>[<index>]" and plurals "<plurals>:<quantity>". Apps that share a
+name, or strings files of one app that define the same resource, have their
+sentences listed together.
+
+Examples:
+
+    python src/corpus_translations.py Settings wifi_settings
+    python src/corpus_translations.py Settings --list
+"""
+
+import argparse
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+TRANSLATIONS = Path(__file__).parent / "../corpus/translations.sqlite"
+
+SCHEMA = """
+CREATE TABLE sentences (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL
+);
+CREATE TABLE resources (
+    id INTEGER PRIMARY KEY,
+    app TEXT NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE (app, name)
+);
+CREATE TABLE translations (
+    resource_id INTEGER NOT NULL REFERENCES resources (id),
+    lang TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    sentence_id INTEGER NOT NULL REFERENCES sentences (id),
+    PRIMARY KEY (resource_id, lang, line, sentence_id)
+) WITHOUT ROWID;
+"""
+
+
+class TranslationWriter:
+    """Write the resources of sorted corpus entries to a translation index.
+
+    add() is called once per entry, in corpus order, with the sentence and the
+    (app, lang, resource name, line) tuples it was extracted from. Rows go
+    straight to disk, so memory use does not grow with the corpus. The
+    database is built next to `path` and only moved into place by close().
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.partial = self.path.with_name(self.path.name + ".partial")
+        self.partial.unlink(missing_ok=True)
+        self.conn = sqlite3.connect(self.partial)
+        self.conn.executescript(
+            "PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;" + SCHEMA
+        )
+        self.next_id = 0
+
+    def add(self, sentence: str, resources: List[Tuple[str, str, str, int]]) -> None:
+        sentence_id = self.next_id
+        self.next_id += 1
+        if not resources:
+            return
+        self.conn.execute(
+            "INSERT INTO sentences (id, text) VALUES (?, ?)", (sentence_id, sentence)
+        )
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO translations (resource_id, lang, line, sentence_id)"
+            " VALUES (?, ?, ?, ?)",
+            [
+                (self._resource_id(app, name), lang, line, sentence_id)
+                for app, lang, name, line in resources
+            ],
+        )
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.execute("VACUUM")
+        self.conn.close()
+        self.partial.replace(self.path)
+
+    def discard(self) -> None:
+        self.conn.close()
+        self.partial.unlink(missing_ok=True)
+
+    def _resource_id(self, app: str, name: str) -> int:
+        row = self.conn.execute(
+            "SELECT id FROM resources WHERE app = ? AND name = ?", (app, name)
+        ).fetchone()
+        if row:
+            return row[0]
+        return self.conn.execute(
+            "INSERT INTO resources (app, name) VALUES (?, ?)", (app, name)
+        ).lastrowid
+
+
+class TranslationIndex:
+    """Look up all translations of a string resource."""
+
+    def __init__(self, path: Path = TRANSLATIONS):
+        if not Path(path).exists():
+            raise FileNotFoundError(
+                f"{path} does not exist, run extract_strings.py --translations"
+            )
+        self.conn = sqlite3.connect(
+            f"{Path(path).resolve().as_uri()}?mode=ro", uri=True
+        )
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def resources(self, app: str) -> List[str]:
+        rows = self.conn.execute(
+            "SELECT name FROM resources WHERE app = ? ORDER BY name", (app,)
+        )
+        return [name for (name,) in rows]
+
+    def translations(self, app: str, name: str) -> Dict[str, List[str]]:
+        """Return locale -> the sentences of the resource in that locale."""
+        rows = self.conn.execute(
+            "SELECT t.lang, s.text FROM resources r"
+            " JOIN translations t ON t.resource_id = r.id"
+            " JOIN sentences s ON s.id = t.sentence_id"
+            " WHERE r.app = ? AND r.name = ?"
+            " ORDER BY t.lang, t.line, t.sentence_id",
+            (app, name),
+        )
+        result: Dict[str, List[str]] = {}
+        for lang, text in rows:
+            result.setdefault(lang, []).append(text)
+        return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("app", help="App the resource belongs to.")
+    parser.add_argument("name", nargs="?", help="Resource name.")
+    parser.add_argument(
+        "--list", action="store_true", help="List the resource names of the app."
+    )
+    parser.add_argument(
+        "--translations", type=Path, default=TRANSLATIONS, help="Index to use."
+    )
+    args = parser.parse_args()
+    if not args.list and args.name is None:
+        parser.error("give a resource name or --list")
+
+    with closing(TranslationIndex(args.translations)) as index:
+        if args.list:
+            for name in index.resources(args.app):
+                print(name)
+            return
+        for lang, sentences in index.translations(args.app, args.name).items():
+            for sentence in sentences:
+                print(f"{lang}\t{sentence}")
+
+
+if __name__ == "__main__":
+    main()
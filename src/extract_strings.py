@@ -12,19 +12,44 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import argparse
+import heapq
 import itertools
 import json
 import re
 import subprocess
+import sys
+import tempfile
 import xml.etree.ElementTree as ET
 from collections import defaultdict
+from contextlib import ExitStack, contextmanager
 from dataclasses import dataclass, field
+from operator import itemgetter
 from pathlib import Path
-from typing import Set
+from typing import Dict, Iterable, Iterator, List, Set, Tuple, Union
+
+import corpus_features
+import corpus_ndjson
+import corpus_sqlite
+import corpus_translations
 
 RESULT = Path(__file__).parent / "../corpus/aosp.json"
 DOWNLOADS = Path(__file__).parent / "../repos"
 
+# Rough per-record bookkeeping cost (tuple, set slot) on top of the sentence
+# itself, used to estimate how much memory the spill buffer holds.
+RECORD_OVERHEAD = 120
+# Maximum number of sorted runs merged at once, to stay well clear of open
+# file limits.
+MERGE_FAN_IN = 128
+
+# (sentence, app, lang), followed by (resource name, line within the resource)
+# when resources are tracked.
+Record = Tuple[Union[str, int], ...]
+Entry = Tuple[str, List[str], List[str]]
+# (app, lang, resource name, line within the resource)
+Resource = Tuple[str, str, str, int]
+
 # List below generated by running the following snippet in the DevTools console
 # on the following page:
 # https://android.googlesource.com/
@@ -593,27 +618,282 @@ class Source:
 
 
 def main():
-    download_sources()
-    strings = defaultdict(Source)
+    parser = argparse.ArgumentParser(
+        description="Extract UI strings from AOSP apps into corpus/aosp.json."
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=positive_int,
+        metavar="MB",
+        help="Aggregate sentences in sorted runs that are spilled to temporary "
+        "files whenever roughly this many megabytes are buffered, then merge "
+        "the runs into the result. By default everything is kept in memory.",
+    )
+    parser.add_argument(
+        "--from-corpus",
+        action="store_true",
+        help="Do not download or extract anything, only write the exports "
+        "below from the existing corpus/aosp.json.",
+    )
+    parser.add_argument(
+        "--sqlite",
+        type=Path,
+        nargs="?",
+        const=corpus_sqlite.DATABASE,
+        metavar="PATH",
+        help="Also export the corpus to an SQLite database, by default "
+        "corpus/aosp.sqlite. Query it with corpus_sqlite.py.",
+    )
+    parser.add_argument(
+        "--features",
+        type=Path,
+        nargs="?",
+        const=corpus_features.FEATURES,
+        metavar="DIR",
+        help="Also write a columnar table of per-sentence features, by default "
+        "to corpus/features. Filter on it with corpus_features.py.",
+    )
+    parser.add_argument(
+        "--ndjson",
+        type=ndjson_path,
+        nargs="?",
+        const=corpus_ndjson.NDJSON,
+        metavar="PATH",
+        help="Also write the corpus as NDJSON in independently compressed "
+        "chunks (.gz or .xz), by default to corpus/aosp.ndjson.gz. Read it "
+        "with corpus_ndjson.py.",
+    )
+    parser.add_argument(
+        "--ndjson-chunk-size",
+        type=positive_int,
+        default=corpus_ndjson.CHUNK_SIZE,
+        metavar="LINES",
+        help="Number of lines per NDJSON chunk.",
+    )
+    parser.add_argument(
+        "--translations",
+        type=Path,
+        nargs="?",
+        const=corpus_translations.TRANSLATIONS,
+        metavar="PATH",
+        help="Also write an SQLite index of the sentences of every string "
+        "resource by app, resource name and locale, by default to "
+        "corpus/translations.sqlite. Query it with corpus_translations.py.",
+    )
+    args = parser.parse_args()
+    if args.from_corpus and args.translations:
+        parser.error("--translations needs resource names, drop --from-corpus")
+
+    writers = []
+    translations = None
+    try:
+        if args.from_corpus:
+            entries = read_json(RESULT)
+        else:
+            download_sources()
+            records = iter_records(resources=bool(args.translations))
+            if args.memory_budget:
+                budget = args.memory_budget * 1024 * 1024
+                entries = aggregate_external(records, budget)
+            else:
+                entries = aggregate(records)
+            writers.append(JsonWriter(RESULT))
+        if args.sqlite:
+            writers.append(corpus_sqlite.DatabaseWriter(args.sqlite))
+        if args.features:
+            writers.append(corpus_features.FeatureWriter(args.features))
+        if args.ndjson:
+            chunk_size = args.ndjson_chunk_size
+            writers.append(corpus_ndjson.NdjsonWriter(args.ndjson, chunk_size))
+        if args.translations:
+            translations = corpus_translations.TranslationWriter(args.translations)
+
+        for entry, resources in entries:
+            for writer in writers:
+                writer.add(entry)
+            if translations:
+                translations.add(entry[0], resources)
+    except BaseException:
+        # Leave the previous outputs untouched.
+        for writer in writers:
+            writer.discard()
+        if translations:
+            translations.discard()
+        raise
+    for writer in writers:
+        writer.close()
+    if translations:
+        translations.close()
+
+
+def positive_int(text: str) -> int:
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"must be positive, got {value}")
+    return value
+
+
+def ndjson_path(text: str) -> Path:
+    path = Path(text)
+    try:
+        corpus_ndjson.codec(path)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return path
+
+
+def iter_records(resources: bool = False) -> Iterator[Record]:
+    """Yield a record for every extracted sentence.
+
+    Resource names and lines are only included if `resources` is set, as they
+    make aggregation considerably more expensive.
+    """
     for app, lang, sentences in glob_read_strings_files():
-        for sentence in sentences:
-            strings[sentence].apps.add(app)
-            strings[sentence].langs.add(lang)
-    with open(RESULT, "w", encoding="utf-8") as fp:
-        json.dump(
-            dict(
-                sorted(
-                    (
-                        string,
-                        {"apps": sorted(source.apps), "langs": sorted(source.langs)},
-                    )
-                    for string, source in strings.items()
-                )
-            ),
-            fp,
-            ensure_ascii=False,
-            indent=2,
+        for resource, line, sentence in sentences:
+            if resources:
+                yield sentence, app, lang, resource, line
+            else:
+                yield sentence, app, lang
+
+
+def aggregate(records: Iterable[Record]) -> Iterator[Tuple[Entry, List[Resource]]]:
+    """Group records by sentence in memory.
+
+    Yields sorted entries, each with the resources the sentence comes from if
+    the records include them.
+    """
+    strings = defaultdict(Source)
+    resources: Dict[str, Set[Resource]] = defaultdict(set)
+    for sentence, app, lang, *resource in records:
+        strings[sentence].apps.add(app)
+        strings[sentence].langs.add(lang)
+        if resource:
+            resources[sentence].add((app, lang, *resource))
+    for string in sorted(strings):
+        source = strings[string]
+        entry = string, sorted(source.apps), sorted(source.langs)
+        yield entry, sorted(resources.get(string, ()))
+
+
+def aggregate_external(
+    records: Iterable[Record], budget: int
+) -> Iterator[Tuple[Entry, List[Resource]]]:
+    """Group records by sentence with bounded memory, like aggregate().
+
+    Records are buffered until their estimated size reaches `budget` bytes,
+    then written out as a sorted run to a temporary file. The runs are k-way
+    merged at the end, so only the current sentence of each run is held in
+    memory. The output is the same as that of aggregate().
+    """
+    with tempfile.TemporaryDirectory(prefix="aosp-strings-") as tmp:
+        runs: List[Path] = []
+        names = itertools.count()
+
+        def spill(records: Iterable[Record]) -> None:
+            path = Path(tmp) / f"run-{next(names)}.jsonl"
+            write_run(records, path)
+            runs.append(path)
+
+        buffer: Set[Record] = set()
+        size = 0
+        for record in records:
+            if record in buffer:
+                continue
+            buffer.add(record)
+            size += sys.getsizeof(record[0]) + RECORD_OVERHEAD
+            if len(record) > 3:
+                size += sys.getsizeof(record[3])
+            if size >= budget:
+                spill(sorted(buffer))
+                buffer.clear()
+                size = 0
+        if buffer or not runs:
+            spill(sorted(buffer))
+            buffer.clear()
+
+        # Merge in several passes if there are too many runs to open at once.
+        while len(runs) > MERGE_FAN_IN:
+            batch, runs[:MERGE_FAN_IN] = runs[:MERGE_FAN_IN], []
+            with merged_runs(batch) as merged:
+                spill(merged)
+            for path in batch:
+                path.unlink()
+
+        with merged_runs(runs) as merged:
+            for string, group in itertools.groupby(merged, key=itemgetter(0)):
+                apps = set()
+                langs = set()
+                resources = set()
+                for _, app, lang, *resource in group:
+                    apps.add(app)
+                    langs.add(lang)
+                    if resource:
+                        resources.add((app, lang, *resource))
+                yield (string, sorted(apps), sorted(langs)), sorted(resources)
+
+
+def write_run(records: Iterable[Record], path: Path) -> None:
+    """Write sorted records to a run file, one JSON array per line."""
+    with open(path, "w", encoding="utf-8") as fp:
+        for record in records:
+            fp.write(json.dumps(record, ensure_ascii=False))
+            fp.write("\n")
+
+
+@contextmanager
+def merged_runs(paths: List[Path]) -> Iterator[Iterator[Record]]:
+    """Open run files and yield the deduplicated k-way merge of their records."""
+    with ExitStack() as stack:
+        files = [stack.enter_context(open(p, encoding="utf-8")) for p in paths]
+        merged = heapq.merge(
+            *((tuple(json.loads(line)) for line in fp) for fp in files)
+        )
+        # Equal records from different runs come out adjacent.
+        yield (record for record, _ in itertools.groupby(merged))
+
+
+class JsonWriter:
+    """Write sorted entries to `path` as json.dump() would write the dict.
+
+    Entries are serialized one at a time, so the whole corpus never has to be
+    held in memory. The file is written next to `path` and only moved into
+    place by close(), so readers never see a partial corpus.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.partial = self.path.with_name(self.path.name + ".partial")
+        self.fp = open(self.partial, "w", encoding="utf-8")
+        self.separator = "{\n"
+
+    def add(self, entry: Entry) -> None:
+        string, apps, langs = entry
+        item = json.dumps(
+            {string: {"apps": apps, "langs": langs}}, ensure_ascii=False, indent=2
         )
+        # Drop the braces around the single-item object, keep its indentation.
+        self.fp.write(self.separator + item[2:-2])
+        self.separator = ",\n"
+
+    def close(self) -> None:
+        self.fp.write("{}" if self.separator == "{\n" else "\n}")
+        self.fp.close()
+        self.partial.replace(self.path)
+
+    def discard(self) -> None:
+        self.fp.close()
+        self.partial.unlink(missing_ok=True)
+
+
+def read_json(path: Path) -> Iterator[Tuple[Entry, List[Resource]]]:
+    """Yield the entries of a previously written corpus.
+
+    The corpus does not record resources, so those are always empty.
+    """
+    with open(path, encoding="utf-8") as fp:
+        data = json.load(fp)
+    for string, info in data.items():
+        yield (string, info["apps"], info["langs"]), []
 
 
 def download_sources():
@@ -638,9 +918,7 @@ def glob_read_strings_files():
             sentences = []
             tree = ET.parse(path)
             root = tree.getroot()
-            for string in itertools.chain(
-                root.findall(".//string"), root.findall(".//item")
-            ):
+            for resource, string in string_elements(root):
                 for xliff_g in string.findall(
                     "./{urn:oasis:names:tc:xliff:document:1.2}g"
                 ):
@@ -663,13 +941,30 @@ def glob_read_strings_files():
                 # Split by lines and strip each
                 # We're only interested in continuous lines (no breaks) for
                 # kerning measurement purposes.
-                for line in s.split("\n"):
-                    line = line.strip()
-                    if line:
-                        sentences.append(line)
+                lines = (line.strip() for line in s.split("\n"))
+                for number, line in enumerate(filter(None, lines)):
+                    sentences.append((resource, number, line))
             yield name, lang, sentences
 
 
+def string_elements(root):
+    """Yield (resource name, element) for every string and item element.
+
+    Items of string arrays are named "<array>[<index>]" and items of plurals
+    "<plurals>:<quantity>".
+    """
+    for string in root.iter("string"):
+        yield string.get("name", ""), string
+    for parent in root.iter():
+        for index, item in enumerate(parent.findall("item")):
+            if "name" in item.attrib:
+                yield item.get("name"), item
+            elif "quantity" in item.attrib:
+                yield f"{parent.get('name', '')}:{item.get('quantity')}", item
+            else:
+                yield f"{parent.get('name', '')}[{index}]", item
+
+
 def unescape(m):
     g = m.group(1)
     if g[0] == "u":
@@ -0,0 +1,75 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import extract_strings  # noqa: E402
+
+
+def make_records(count, resources=False):
+    rng = random.Random(count)
+    records = []
+    for _ in range(count):
+        # Few distinct characters, so that sentences repeat across apps/langs.
+        sentence = "".join(rng.choice('ab "\\\té日 ') for _ in range(6)).strip()
+        app = rng.choice(["Calc", "Dialer"])
+        lang = rng.choice(["en", "de", "ja-rJP"])
+        record = (sentence or "x", app, lang)
+        if resources:
+            resource = rng.choice(["title", "items[0]", "files:one"])
+            record += (resource, rng.randint(0, 2))
+        records.append(record)
+    return records
+
+
+def write_json(entries, path):
+    writer = extract_strings.JsonWriter(path)
+    for entry, _resources in entries:
+        writer.add(entry)
+    writer.close()
+    return path.read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("count", [0, 1, 5000])
+def test_json_writer_matches_json_dump(tmp_path, count):
+    records = make_records(count)
+    expected = {}
+    for sentence, app, lang in sorted(records):
+        info = expected.setdefault(sentence, {"apps": [], "langs": []})
+        info["apps"] = sorted({*info["apps"], app})
+        info["langs"] = sorted({*info["langs"], lang})
+
+    written = write_json(extract_strings.aggregate(records), tmp_path / "aosp.json")
+
+    assert written == json.dumps(expected, ensure_ascii=False, indent=2)
+    assert not (tmp_path / "aosp.json.partial").exists()
+
+
+@pytest.mark.parametrize("count", [0, 1, 5000])
+@pytest.mark.parametrize("resources", [False, True])
+def test_external_aggregation_matches_in_memory(monkeypatch, count, resources):
+    records = make_records(count, resources)
+    # Small runs and fan-in force several merge passes.
+    monkeypatch.setattr(extract_strings, "MERGE_FAN_IN", 3)
+
+    external = list(extract_strings.aggregate_external(records, budget=2000))
+
+    assert external == list(extract_strings.aggregate(records))